@@ -0,0 +1,41 @@
+"""
+Helpers for rendering shell commands that are sent to the remote machine.
+"""
+
+from functools import lru_cache
+from typing import List
+import shlex
+import string
+
+_SAFE = frozenset(string.ascii_letters + string.digits + "@%+=:,./-_")
+
+# Image names, paths and flag values repeat across the commands of a DAG, so quoted results are cached.
+_quote_cached = lru_cache(maxsize=4096)(shlex.quote)
+
+def _quote_fast_py(arg: str) -> str:
+    """Returns the argument unchanged if it needs no shell quoting, otherwise `shlex.quote(arg)`."""
+    if arg and _SAFE.issuperset(arg):
+        return arg
+    return _quote_cached(arg)
+
+def _join_args_py(args) -> str:
+    """Quotes each argument with `quote_fast` and joins them into a single command string."""
+    return " ".join(map(quote_fast, args))
+
+def flatten(flags) -> List[str]:
+    """Flattens command flags given either as a flat list of strings or as a list of flag lists."""
+    flatten_flags = []
+    for f in flags or ():
+        if isinstance(f, str):
+            flatten_flags.append(f)
+        else:
+            flatten_flags.extend(f)
+    return flatten_flags
+
+try:
+    from airops import _shell_c
+except ImportError:
+    quote_fast, join_args = _quote_fast_py, _join_args_py
+else:
+    # The compiled helpers, built when Cython and a compiler are available, replace the pure-Python ones.
+    quote_fast, join_args = _shell_c.quote_fast, _shell_c.join_args
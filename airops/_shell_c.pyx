@@ -0,0 +1,34 @@
+# cython: language_level=3
+"""
+Compiled versions of `quote_fast` and `join_args` from `airops._shell`, used when the extension is built.
+"""
+
+from cpython.unicode cimport PyUnicode_Check
+from functools import lru_cache
+import shlex
+
+_quote_cached = lru_cache(maxsize=4096)(shlex.quote)
+
+cdef inline bint _is_safe(str arg):
+    cdef Py_UCS4 c
+    if not arg:
+        return False
+    for c in arg:
+        if not (
+            ("a" <= c <= "z") or ("A" <= c <= "Z") or ("0" <= c <= "9")
+            or c in "@%+=:,./-_"
+        ):
+            return False
+    return True
+
+cpdef quote_fast(arg):
+    """Returns the argument unchanged if it needs no shell quoting, otherwise `shlex.quote(arg)`."""
+    # PyUnicode_Check accepts str subclasses such as StrEnum members, like the pure-Python version.
+    if PyUnicode_Check(arg) and _is_safe(<str>arg):
+        return arg
+    return _quote_cached(arg)
+
+def join_args(args) -> str:
+    """Quotes each argument with `quote_fast` and joins them into a single command string."""
+    cdef list quoted = [quote_fast(arg) for arg in args]
+    return " ".join(quoted)
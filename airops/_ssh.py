@@ -0,0 +1,162 @@
+"""
+Shared SSH execution for airops classes, reusing one SSH client per connection ID within a process.
+"""
+
+from typing import Dict
+from airflow.providers.ssh.hooks.ssh import SSHHook
+from airflow.providers.ssh.operators.ssh import SSHOperator
+import atexit
+import contextlib
+import hashlib
+import paramiko
+import threading
+import uuid
+
+_CLIENT_POOL: Dict[str, paramiko.SSHClient] = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+class _Upload(str):
+    """
+    A command argument naming a remote file whose content is uploaded over SFTP while the command runs.
+
+    The value is a content-addressed placeholder name, replaced in the command by the absolute path of the
+    uploaded file. Being a `str`, it travels with the other flags through list concatenation until the command
+    is executed.
+    """
+
+    content: str
+
+    def __new__(cls, prefix: str, content: str) -> "_Upload":
+        upload = super().__new__(cls, f".airops_{prefix}_{hashlib.sha1(content.encode()).hexdigest()[:16]}")
+        upload.content = content
+        return upload
+
+def _uploads(args) -> Dict[str, str]:
+    """Returns the files to upload for the given command arguments, as remote path to content."""
+    return {str(arg): arg.content for arg in args if isinstance(arg, _Upload)}
+
+def _pooled_client(ssh_conn_id: str, hook: SSHHook) -> paramiko.SSHClient:
+    """Returns the pooled SSH client for the connection, connecting with the given hook if there is no live one."""
+    with _CLIENT_POOL_LOCK:
+        client = _CLIENT_POOL.get(ssh_conn_id)
+        transport = client.get_transport() if client is not None else None
+        if transport is None or not transport.is_active():
+            if client is not None:
+                # Release the socket and threads of the dead connection before replacing it.
+                client.close()
+            client = hook.get_conn()
+            _CLIENT_POOL[ssh_conn_id] = client
+        return client
+
+@atexit.register
+def _close_pooled_clients() -> None:
+    """Closes all pooled SSH clients."""
+    with _CLIENT_POOL_LOCK:
+        for client in _CLIENT_POOL.values():
+            client.close()
+        _CLIENT_POOL.clear()
+
+class _OperatorSSHClient:
+    """
+    Proxies an SSH client for an operator: records the channel of each command it executes and writes the
+    operator's `stdin` data to the command before the hook closes its stdin.
+    """
+
+    def __init__(self, client: paramiko.SSHClient, operator: "_PooledSSHOperator") -> None:
+        self._client = client
+        self._operator = operator
+
+    def exec_command(self, *args, **kwargs):
+        if self._operator.stdin is not None and kwargs.get("get_pty"):
+            # A pseudo-terminal echoes stdin into the logged output and never passes EOF to the command.
+            raise ValueError("Cannot send stdin data to a command running with get_pty=True.")
+        stdin, stdout, stderr = self._client.exec_command(*args, **kwargs)
+        self._operator._channel = stdout.channel
+        if self._operator.stdin is not None:
+            stdin.write(self._operator.stdin)
+            stdin.flush()
+        return stdin, stdout, stderr
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def __enter__(self) -> "_OperatorSSHClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._client.close()
+
+class _PooledSSHOperator(SSHOperator):
+    """
+    SSHOperator that reuses one SSH client per connection ID within a process instead of opening
+    a new connection for every command. Clients are closed when the process exits.
+
+    Files given in `files` (placeholder in the command to content) are uploaded over SFTP under a unique name in
+    the SFTP home directory for the duration of the command, referenced in the command by absolute path so that
+    earlier `cd` steps do not affect them, and removed afterwards. `stdin`
+    is written to the standard input of the command, keeping secrets such as passwords out of the command line.
+    """
+
+    def __init__(self, *, files: Dict[str, str] = None, stdin: str = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.files = files or {}
+        self.stdin = stdin
+        self._channel = None
+
+    def _uses_pool(self) -> bool:
+        return not self.remote_host and bool(self.ssh_conn_id)
+
+    def get_ssh_client(self):
+        if not self._uses_pool():
+            return _OperatorSSHClient(super().get_ssh_client(), self)
+        # nullcontext keeps SSHOperator.execute from closing the pooled client.
+        return contextlib.nullcontext(_OperatorSSHClient(_pooled_client(self.ssh_conn_id, self.hook), self))
+
+    def on_kill(self) -> None:
+        """Closes the channel of this task, leaving the pooled client to the other operators using it."""
+        if not self._uses_pool():
+            return super().on_kill()
+        if self._channel is not None:
+            self._channel.close()
+            self.log.info("SSH channel closed.")
+        else:
+            self.log.info("No SSH channel to close.")
+
+    def run_ssh_client_command(self, ssh_client: paramiko.SSHClient, command: str, context=None) -> bytes:
+        if not self.files:
+            return super().run_ssh_client_command(ssh_client, command, context=context)
+        # Unique names keep concurrent tasks with the same content from removing each other's files.
+        remote_paths = {path: f"{path}_{uuid.uuid4().hex}" for path in self.files}
+        with ssh_client.open_sftp() as sftp:
+            uploaded = []
+            try:
+                for path, content in self.files.items():
+                    with sftp.open(remote_paths[path], "w") as f:
+                        uploaded.append(remote_paths[path])
+                        f.chmod(0o600)
+                        f.write(content)
+                    command = command.replace(path, sftp.normalize(remote_paths[path]))
+                return super().run_ssh_client_command(ssh_client, command, context=context)
+            finally:
+                for remote_path in uploaded:
+                    try:
+                        sftp.remove(remote_path)
+                    except IOError:
+                        self.log.warning("Could not remove %s from the remote machine.", remote_path)
+
+class _SSHMixin:
+    """
+    Executes commands on the remote machine identified by `self.ssh_conn_id` through the pooled SSH client.
+    """
+
+    ssh_conn_id: str
+
+    def _ssh(self, command, **kwargs):
+        """
+        Executes the given command on the remote machine via SSH.
+
+        Args:
+            command (str): The command to execute.
+            **kwargs: Additional arguments for SSH execution.
+        """
+        return _PooledSSHOperator(ssh_conn_id=self.ssh_conn_id, command=command, **kwargs)
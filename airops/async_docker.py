@@ -0,0 +1,231 @@
+"""
+This module provides an asyncio client for the Docker Engine API of a remote machine, reached over a single long-lived
+SSH connection instead of running the `docker` CLI through a new SSH session for every command.
+
+Each API request opens a new channel to the remote Docker socket on the same SSH connection, so concurrent requests
+share one SSH handshake. It requires the optional `asyncssh` dependency (`pip install airops[async]`).
+
+Classes:
+    - AsyncDocker: Runs containers and inspects or pulls images through the remote Docker Engine API.
+    - DockerAPIError: Raised when the Docker Engine API responds with an error status.
+
+Usage Example:
+    async with AsyncDocker(ssh_conn_id="my_ssh_connection") as docker:
+        await docker.pull("my_image")
+        exit_code = await docker.run("my_image", cmd=["python", "app.py"], env={"ENV_VAR": "value"})
+"""
+
+from contextlib import suppress
+from typing import Dict, List, Tuple, Union
+from urllib.parse import quote, urlencode
+from airflow.providers.ssh.hooks.ssh import SSHHook
+import asyncio
+import base64
+import json
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+class DockerAPIError(RuntimeError):
+    """Raised when the Docker Engine API responds with an error status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+class AsyncDocker:
+    """
+    Talks to the Docker Engine API on the remote machine over one SSH connection.
+
+    Attributes:
+        - ssh_conn_id (str): SSH connection ID used to connect to the remote machine.
+        - socket_path (str): Path of the Docker daemon socket on the remote machine.
+        - _username (str): Docker Hub username used when pulling images.
+        - _password (str): Docker Hub password used when pulling images.
+    """
+
+    def __init__(self, ssh_conn_id: str, username: str = None, password: str = None, socket_path: str = "/var/run/docker.sock") -> None:
+        """
+        Initializes the AsyncDocker object with SSH connection details and optional Docker Hub credentials.
+
+        Args:
+            ssh_conn_id (str): SSH connection ID used to connect to the remote machine.
+            username (str, optional): Docker Hub username used when pulling images.
+            password (str, optional): Docker Hub password used when pulling images.
+            socket_path (str, optional): Path of the Docker daemon socket on the remote machine. Defaults to "/var/run/docker.sock".
+        """
+        if asyncssh is None:
+            raise ImportError("AsyncDocker requires asyncssh; install it with `pip install airops[async]`.")
+        self.ssh_conn_id = ssh_conn_id
+        self.socket_path = socket_path
+        self._username = username
+        self._password = password
+        self._conn = None
+        self._connect_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncDocker":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """Opens the SSH connection using the settings of the Airflow SSH connection."""
+        # Concurrent first requests wait for the same connection instead of each opening one.
+        async with self._connect_lock:
+            if self._conn is not None:
+                return
+            hook = SSHHook(ssh_conn_id=self.ssh_conn_id)
+            extra = hook.get_connection(self.ssh_conn_id).extra_dejson
+            options = {
+                "port": hook.port or 22,
+                "username": hook.username,
+                "password": hook.password,
+            }
+            if extra.get("private_key"):
+                options["client_keys"] = [asyncssh.import_private_key(extra["private_key"], extra.get("private_key_passphrase"))]
+            elif hook.key_file:
+                options["client_keys"] = [hook.key_file]
+            if hook.no_host_key_check:
+                options["known_hosts"] = None
+            self._conn = await asyncssh.connect(hook.remote_host, **options)
+
+    async def close(self) -> None:
+        """Closes the SSH connection."""
+        if self._conn is not None:
+            self._conn.close()
+            await self._conn.wait_closed()
+            self._conn = None
+
+    async def _request(self, method: str, path: str, body: dict = None, headers: Dict[str, str] = None) -> Tuple[int, bytes]:
+        """
+        Sends an HTTP request to the Docker daemon on a new channel of the SSH connection.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The API path, including the query string.
+            body (dict, optional): JSON body of the request.
+            headers (Dict[str, str], optional): Additional request headers.
+
+        Returns:
+            Tuple[int, bytes]: The response status code and body.
+        """
+        await self.connect()
+        data = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", "Host: docker", "Connection: close", f"Content-Length: {len(data)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        reader, writer = await self._conn.open_unix_connection(self.socket_path, encoding=None)
+        try:
+            writer.write("\r\n".join(lines).encode() + b"\r\n\r\n" + data)
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            response_headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+            if response_headers.get("transfer-encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int((await reader.readline()).split(b";")[0], 16)
+                    if size == 0:
+                        break
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readexactly(2)
+                response = b"".join(chunks)
+            else:
+                response = await reader.readexactly(int(response_headers.get("content-length", 0)))
+        finally:
+            writer.close()
+        if status >= 400:
+            try:
+                message = json.loads(response).get("message", response.decode())
+            except ValueError:
+                message = response.decode(errors="replace")
+            raise DockerAPIError(status, f"Docker API {method} {path} failed with status {status}: {message}")
+        return status, response
+
+    async def image_exists(self, image_name: str) -> bool:
+        """Returns whether the image exists on the remote machine."""
+        try:
+            await self._request("GET", f"/images/{quote(image_name, safe='/:@')}/json")
+        except DockerAPIError as e:
+            if e.status == 404:
+                return False
+            raise
+        return True
+
+    async def pull(self, image_name: str) -> None:
+        """
+        Pulls the image, authenticating with the Docker Hub credentials if provided.
+
+        Args:
+            image_name (str): The name of the Docker image to pull.
+        """
+        repository, _, tag = image_name.rpartition(":")
+        if not repository or "/" in tag:
+            repository, tag = image_name, "latest"
+        headers = None
+        if self._username and self._password:
+            auth = json.dumps({"username": self._username, "password": self._password}).encode()
+            headers = {"X-Registry-Auth": base64.urlsafe_b64encode(auth).decode()}
+        path = "/images/create?" + urlencode({"fromImage": repository, "tag": tag})
+        status, response = await self._request("POST", path, headers=headers)
+        # Pull failures after the stream has started are reported as progress messages with an "error" key.
+        for line in response.splitlines():
+            if line.strip() and "error" in json.loads(line):
+                raise DockerAPIError(status, f"Docker API POST {path} failed: {json.loads(line)['error']}")
+
+    async def run(self, image_name: str, cmd: List[str] = None, env: Dict[str, str] = None, volume: Dict[str, str] = None, publish: Dict[str, str] = None, name: str = None, detach: bool = False, remove: bool = True) -> Union[int, str]:
+        """
+        Creates and starts a container, the API equivalent of `docker run`.
+
+        Args:
+            image_name (str): The name of the Docker image to run.
+            cmd (List[str], optional): Command to run in the container instead of the image default.
+            env (Dict[str, str], optional): Environment variables, as in `DockerRunFlag.env`.
+            volume (Dict[str, str], optional): Host to container bind mounts, as in `DockerRunFlag.volume`.
+            publish (Dict[str, str], optional): Host to container port mappings, as in `DockerRunFlag.publish`.
+            name (str, optional): The name of the container.
+            detach (bool, optional): Whether to return right after starting the container. Defaults to False.
+            remove (bool, optional): Whether to remove the container once it exits. Defaults to True.
+
+        Returns:
+            Union[int, str]: The container exit code, or the container ID when detached.
+        """
+        host_config = {"AutoRemove": remove and detach}
+        config = {"Image": image_name, "HostConfig": host_config}
+        if cmd is not None:
+            config["Cmd"] = list(cmd)
+        if env:
+            config["Env"] = [f"{key}={value}" for key, value in env.items()]
+        if volume:
+            host_config["Binds"] = [f"{host}:{container}" for host, container in volume.items()]
+        if publish:
+            ports = {f"{container}/tcp" if "/" not in str(container) else str(container): host for host, container in publish.items()}
+            config["ExposedPorts"] = {port: {} for port in ports}
+            host_config["PortBindings"] = {port: [{"HostPort": str(host)}] for port, host in ports.items()}
+        query = "?" + urlencode({"name": name}) if name else ""
+        _, response = await self._request("POST", "/containers/create" + query, body=config)
+        container_id = json.loads(response)["Id"]
+        try:
+            await self._request("POST", f"/containers/{container_id}/start")
+            if detach:
+                return container_id
+            _, response = await self._request("POST", f"/containers/{container_id}/wait")
+        except BaseException:
+            # The container may never have started or may still be running, so force the removal and keep the original error.
+            if remove:
+                with suppress(Exception):
+                    await self._request("DELETE", f"/containers/{container_id}?force=true")
+            raise
+        if remove:
+            await self._request("DELETE", f"/containers/{container_id}")
+        return json.loads(response)["StatusCode"]
@@ -6,6 +6,7 @@ Classes:
     - DockerRunFlag: Provides methods to generate lists of flags for the `docker run` command.
     - DockerBuildFlag: Provides methods to generate lists of flags for the `docker build` command.
     - Docker: A class to manage Docker commands execution via SSH, including login, build, and run operations.
+    - DockerScript: Collects several commands and executes them in a single SSH call.
 
 Usage Example:
     docker = Docker(ssh_conn_id="my_ssh_connection", username="myuser", password="mypassword")
@@ -18,25 +19,59 @@ Usage Example:
         image_name="my_image",
         docker_flags=DockerRunFlag.temp_container() + DockerRunFlag.env({"ENV_VAR": "value"}) + DockerRunFlag.volume({"/host/path": "/container/path"})
     )
+
+    # Build and run in a single SSH call, logging in only once.
+    docker.pipeline() \
+        .build(image_name="my_image", docker_flags=DockerBuildFlag.pull()) \
+        .run(image_name="my_image", docker_flags=DockerRunFlag.temp_container()) \
+        .execute(task_id="build_and_run")
 """
 
 from typing import Dict, List, Union
-from airflow.providers.ssh.operators.ssh import SSHOperator
+from airops._shell import flatten, join_args, quote_fast
+from airops._ssh import _SSHMixin, _Upload, _uploads
 import shlex
+import warnings
+
+# Succeeds when Docker on the remote machine already has credentials stored for Docker Hub.
+_DOCKER_HUB_LOGGED_IN = "grep -qs '\"https://index.docker.io/v1/\"' ~/.docker/config.json"
+
+def _flag_pairs(flag: str, mapping: Dict[str, str], sep: str) -> List[str]:
+    """Returns `[flag, "key<sep>value", ...]` for each mapping item, filling a preallocated list."""
+    arg = [flag] * (2 * len(mapping))
+    i = 1
+    for key, value in mapping.items():
+        arg[i] = f"{key}{sep}{value}"
+        i += 2
+    return arg
+
+def _image_repository(image_name: str) -> str:
+    """Returns the image name without its tag, e.g. `registry:5000/app` for `registry:5000/app:1.0`."""
+    repository, _, tag = image_name.rpartition(":")
+    if repository and "/" not in tag:
+        return repository
+    return image_name
+
+def _docker_build(flags: List[str]) -> str:
+    """Returns the `docker build` invocation, enabling BuildKit when cache flags are used."""
+    if "--cache-from" in flags or "BUILDKIT_INLINE_CACHE=1" in flags:
+        return "DOCKER_BUILDKIT=1 docker build"
+    return "docker build"
+
+def _group(command: str) -> str:
+    """Wraps a raw command in braces so that `;`, `||` or a trailing comment in it cannot affect the commands around it."""
+    return "{ " + command + "\n}"
+
+def _check_no_uploads(files: Dict[str, str]) -> None:
+    """Raises ValueError for commands that would reference env files that are never uploaded."""
+    if files:
+        raise ValueError(
+            "Flags from DockerRunFlag.env(..., threshold=...) use an env file that is only uploaded when the command "
+            "is executed through Docker.run or DockerScript.execute; pass threshold=None to use -e flags instead.")
 
 class DockerRunFlag:
     """
     Provides static methods to generate flag options for the `docker run` command.
-
-    Methods:
-        - detach(): Returns the flag for running a container in detached mode.
-        - interactive(): Returns the flag for interactive mode.
-        - tty(): Returns the flag for allocating a pseudo-TTY.
-        - temp_container(): Returns the flag for automatically removing the container when it exits.
-        - name(name: str): Returns the flag for setting the container's name.
-        - publish(ports: Dict[str, str]): Returns the flag for publishing container ports to the host.
-        - env(envs: Dict[str, str]): Returns the flag for setting environment variables in the container.
-        - volume(volume: Dict[str, str]): Returns the flag for binding mount volumes.
     """
 
     @staticmethod
@@ -67,47 +102,39 @@ class DockerRunFlag:
     @staticmethod
     def publish(ports: Dict[str, str]) -> List[str]:
         """Returns flags for publishing container ports to the host."""
-        arg = []
-        for p1, p2 in ports.items():
-            arg += ["-p", f"{p1}:{p2}"]
-        return arg
+        return _flag_pairs("-p", ports, ":")
 
     @staticmethod
-    def env(envs: Dict[str, str]) -> List[str]:
-        """Returns flags for setting environment variables in the container."""
-        arg = []
-        for name, value in envs.items():
-            arg += ["-e", f"{name}={value}"]
-        return arg
+    def env(envs: Dict[str, str], threshold: int = None) -> List[str]:
+        """
+        Returns flags for setting environment variables in the container.
+
+        With more than `threshold` variables, the variables are passed with `--env-file`. The file is uploaded
+        over SFTP to the SFTP home directory while the command runs, referenced by its absolute path and removed
+        afterwards, so these flags only work when the command is executed through `Docker.run` or
+        `DockerScript.execute`.
+        """
+        if threshold is not None and len(envs) > threshold:
+            content = "".join([f"{name}={value}\n" for name, value in envs.items()])
+            # The env file format has no escaping, so values spanning lines still need `-e`.
+            if content.count("\n") == len(envs):
+                return ["--env-file", _Upload("env", content)]
+        return _flag_pairs("-e", envs, "=")
 
     @staticmethod
     def volume(volume: Dict[str, str]) -> List[str]:
         """Returns flags for binding mount volumes."""
-        arg = []
-        for p1, p2 in volume.items():
-            arg += ["-v", f"{p1}:{p2}"]
-        return arg
+        return _flag_pairs("-v", volume, ":")
 
 class DockerBuildFlag:
     """
     Provides static methods to generate flag options for the `docker build` command.
-
-    Methods:
-        - build_arg(envs: Dict[str, str]): Returns flags for setting build-time variables.
-        - file(f: str): Returns the flag for specifying a Dockerfile.
-        - no_cache(): Returns the flag for disabling the build cache.
-        - target(t: str): Returns the flag for specifying a build target.
-        - pull(): Returns the flag for always attempting to pull a newer version of the image.
-        - platform(platform_name: str): Returns the flag for specifying the target platform.
     """
 
     @staticmethod
     def build_arg(envs: Dict[str, str]) -> List[str]:
         """Returns flags for setting build-time variables."""
-        arg = []
-        for name, value in envs.items():
-            arg += ["--build-arg", f"{name}={value}"]
-        return arg
+        return _flag_pairs("--build-arg", envs, "=")
 
     @staticmethod
     def file(f: str) -> List[str]:
@@ -134,7 +161,24 @@ class DockerBuildFlag:
         """Returns the flag for specifying the target platform."""
         return ["--platform", platform_name]
 
-class Docker:
+    @staticmethod
+    def cache_from(refs: List[str]) -> List[str]:
+        """
+        Returns flags for using images as layer cache sources.
+
+        Pair with `buildkit_inline_cache()` and push the built image to a registry, so that builds on
+        other machines can pull its layers as cache instead of rebuilding them.
+        """
+        arg = ["--cache-from"] * (2 * len(refs))
+        arg[1::2] = refs
+        return arg
+
+    @staticmethod
+    def buildkit_inline_cache() -> List[str]:
+        """Returns the flag for embedding BuildKit cache metadata into the built image."""
+        return ["--build-arg", "BUILDKIT_INLINE_CACHE=1"]
+
+class Docker(_SSHMixin):
     """
     Manages Docker commands execution via SSH, allowing you to login, build, and run Docker containers remotely.
 
@@ -142,13 +186,6 @@ class Docker:
         - ssh_conn_id (str): SSH connection ID used to connect to the remote machine.
         - _username (str): Docker Hub username for login.
         - _password (str): Docker Hub password for login.
-
-    Methods:
-        - __init__(ssh_conn_id, username=None, password=None): Initializes the Docker object with SSH connection details.
-        - _login_command(): Constructs the `docker login` command based on the provided credentials.
-        - _ssh(command, **kwargs): Executes the given command on the remote machine via SSH.
-        - run(docker_flags, image_name, app_args=None, **kwargs): Executes a `docker run` command with specified flags and image.
-        - build(image_name, docker_flags, project_path=".", **kwargs): Executes a `docker build` command with specified flags and image.
     """
 
     def __init__(self, ssh_conn_id: str, username: str = None, password: str = None) -> None:
@@ -164,19 +201,37 @@ class Docker:
         self._username = username
         self._password = password
     
-    def _login_command(self) -> Union[str, None]:
+    def _login_command(self, password_stdin: bool = False) -> Union[str, None]:
         """
         Constructs the `docker login` command based on the provided credentials.
 
+        With `password_stdin`, the command reads the password from its standard input, which `_ssh` writes to the
+        SSH channel, so the password stays out of the command. Otherwise the command is self-contained and pipes
+        the password to `docker login --password-stdin` with `printf`; the password is then part of the command
+        text and of the argument list of the remote shell running it.
+
+        Docker keeps the credentials in `~/.docker/config.json` on the remote machine after a successful login,
+        so the remote machine skips `docker login` when that file already has an entry for Docker Hub. In the
+        `password_stdin` form the unused password is then read from standard input and discarded.
+
+        Args:
+            password_stdin (bool, optional): Whether the password is sent on the command's standard input. Defaults to False.
+
         Returns:
             Union[str, None]: The login command string if credentials are provided, otherwise None.
         """
-        if self._username and self._password:
-            args = ["docker", "login", "-u", self._username, "-p", self._password]
-            safe_args = [shlex.quote(arg) for arg in args]
-            command = " ".join(safe_args)
-        else:
+        if not (self._username and self._password):
             command = None
+        elif password_stdin:
+            command = (
+                "if " + _DOCKER_HUB_LOGGED_IN + "; then cat >/dev/null;"
+                " else docker login -u " + quote_fast(self._username) + " --password-stdin; fi"
+            )
+        else:
+            command = (
+                _DOCKER_HUB_LOGGED_IN + " || printf '%s\\n' " + shlex.quote(self._password)
+                + " | docker login -u " + quote_fast(self._username) + " --password-stdin"
+            )
         return command
     
     def _ssh(self, command, **kwargs):
@@ -184,13 +239,81 @@ class Docker:
         Executes the given command on the remote machine via SSH.
 
         Args:
-            command (str): The command to execute.
+            command (str): The command to execute, rendered with `password_stdin=True`.
             **kwargs: Additional arguments for SSH execution.
         """
-        return SSHOperator(**{
-            "ssh_conn_id": self.ssh_conn_id,
-            "command": command,
-            **kwargs})
+        if self._username and self._password:
+            if kwargs.get("get_pty"):
+                # The remote terminal would echo the password into the task logs and XCom.
+                raise ValueError("Docker credentials cannot be sent with get_pty=True; log in on the remote machine beforehand instead.")
+            kwargs["stdin"] = self._password + "\n"
+        return super()._ssh(command, **kwargs)
+
+    def _with_login(self, command: str, password_stdin: bool = False) -> str:
+        """
+        Prepends the `docker login` command to the given command if credentials are provided.
+
+        Args:
+            command (str): The command to run after logging in.
+            password_stdin (bool, optional): Whether the password is sent on the command's standard input. Defaults to False.
+
+        Returns:
+            str: The command, preceded by the login command when credentials are provided.
+        """
+        login_command = self._login_command(password_stdin)
+        if login_command:
+            command = login_command + " && " + command
+        return command
+
+    def _run_command(self, docker_flags: List[str], image_name: str, app_args: List[str] = None) -> str:
+        """
+        Constructs the `docker run` command without the login step.
+
+        Args:
+            docker_flags (List[str]): List of flags to pass to the `docker run` command.
+            image_name (str): The name of the Docker image to run.
+            app_args (List[str], optional): Additional arguments to pass to the container.
+
+        Returns:
+            str: The quoted `docker run` command.
+        """
+        app_args = app_args or list()
+        args = [*flatten(docker_flags), image_name, *app_args]
+        return "docker run " + join_args(args)
+
+    def _build_command(self, image_name: str, docker_flags: List[str], project_path: str = ".", reuse: bool = False) -> str:
+        """
+        Constructs the `docker build` command without the login step.
+
+        With `reuse`, the remote machine fingerprints the build flags and every file under `project_path`
+        with SHA-1, and the image is built as `<repository>:<fingerprint>` only if no image with that tag
+        exists yet. The fingerprinted image is then tagged as `image_name`. Files outside `project_path`,
+        such as a Dockerfile given with `-f`, are not part of the fingerprint.
+
+        Args:
+            image_name (str): The name of the Docker image to build.
+            docker_flags (List[str]): List of flags to pass to the `docker build` command.
+            project_path (str, optional): The path to the project directory. Defaults to ".".
+            reuse (bool, optional): Whether to skip the build when an identical image exists. Defaults to False.
+
+        Returns:
+            str: The quoted `docker build` command.
+        """
+        flags = flatten(docker_flags)
+        if not reuse:
+            return _docker_build(flags) + " " + join_args([*flags, "-t", image_name, project_path])
+        safe_path = quote_fast(project_path)
+        fingerprint = (
+            "fingerprint=$(cd " + safe_path + " && { printf '%s\\n' " + quote_fast(join_args(flags))
+            + "; find . -type f -print0 | LC_ALL=C sort -z | xargs -0 sha1sum; } | sha1sum | cut -c1-16)"
+        )
+        cached_image = quote_fast(_image_repository(image_name)) + ':"$fingerprint"'
+        build = " ".join([_docker_build(flags), *map(quote_fast, flags), "-t", cached_image, safe_path])
+        return (
+            fingerprint
+            + " && { docker image inspect " + cached_image + " >/dev/null 2>&1 || " + build + "; }"
+            + " && docker tag " + cached_image + " " + quote_fast(image_name)
+        )
 
     def run(self, docker_flags: List[str], image_name: str, app_args: List[str] = None, return_command: bool = False, **kwargs):
         """
@@ -203,23 +326,15 @@ class Docker:
             return_command (bool, optional): Whether to return the command instead of executing it. Defaults to False.
             **kwargs: Additional arguments for SSH execution.
         """
-        app_args = app_args or list()
-        docker_flags = docker_flags or list()
-        flatten_flags = []
-        for f in docker_flags:
-            flatten_flags.extend(f)
-        args = ["docker", "run", *flatten_flags, image_name, *app_args]
-        safe_args = [shlex.quote(arg) for arg in args]
-        command = " ".join(safe_args)
-        login_command = self._login_command()
-        if login_command:
-            command = login_command + " && " + command
+        command = self._run_command(docker_flags, image_name, app_args)
+        files = _uploads(flatten(docker_flags))
         if return_command:
-            return command
+            _check_no_uploads(files)
+            return self._with_login(command)
         else:
-            return self._ssh(command=command, **kwargs)
+            return self._ssh(command=self._with_login(command, password_stdin=True), files=files, **kwargs)
     
-    def build(self, image_name: str, docker_flags: List[str], project_path: str = ".", return_command: bool = False, **kwargs):
+    def build(self, image_name: str, docker_flags: List[str], project_path: str = ".", return_command: bool = False, reuse: bool = False, **kwargs):
         """
         Executes a `docker build` command with specified flags and image.
 
@@ -228,19 +343,139 @@ class Docker:
             docker_flags (List[str]): List of flags to pass to the `docker build` command.
             project_path (str, optional): The path to the project directory. Defaults to ".".
             return_command (bool, optional): Whether to return the command instead of executing it. Defaults to False.
+            reuse (bool, optional): Whether to skip the build when an image with the same content fingerprint exists. Defaults to False.
             **kwargs: Additional arguments for SSH execution.
         """
-        docker_flags = docker_flags or list()
-        flatten_flags = []
-        for f in docker_flags:
-            flatten_flags.extend(f)
-        args = ["docker", "build", *flatten_flags, "-t", image_name, project_path]
-        safe_args = [shlex.quote(arg) for arg in args]
-        command = " ".join(safe_args)
-        login_command = self._login_command()
-        if login_command:
-            command = login_command + " && " + command
+        command = self._build_command(image_name, docker_flags, project_path, reuse)
         if return_command:
-            return command
+            return self._with_login(command)
         else:
-            return self._ssh(command=command, **kwargs)
+            return self._ssh(command=self._with_login(command, password_stdin=True), **kwargs)
+
+    def pipeline(self, steps: List[str] = None) -> "DockerScript":
+        """
+        Returns a DockerScript that executes several commands in a single SSH call.
+
+        Args:
+            steps (List[str], optional): Initial commands of the script, e.g. `Git.clone(..., return_command=True)`.
+
+        Returns:
+            DockerScript: The script bound to this Docker object.
+        """
+        return DockerScript(self, steps)
+
+    @classmethod
+    def precompile(cls, verb: str, flags: List[str], tail: List[str] = None) -> str:
+        """
+        Returns a quoted `docker <verb>` command built once, e.g. as a constant in a module shared by DAG files,
+        and usable as `SSHOperator(command=...)`. No login step is included.
+
+        Args:
+            verb (str): The Docker subcommand, e.g. "run" or "build".
+            flags (List[str]): List of flags to pass to the subcommand.
+            tail (List[str], optional): Arguments following the flags, e.g. the image name and app arguments.
+
+        Returns:
+            str: The quoted command.
+        """
+        args = [verb, *flatten(flags), *(tail or ())]
+        _check_no_uploads(_uploads(args))
+        if not all(isinstance(arg, str) for arg in args):
+            warnings.warn("Docker.precompile arguments should be constant strings; converting with str().", stacklevel=2)
+            args = [str(arg) for arg in args]
+        return "docker " + join_args(args)
+
+class DockerScript:
+    """
+    Collects commands and executes them in one SSH call, either as a single `&&`-joined command or as a
+    shell script passed to `sh -c`.
+
+    The `docker login` command is prepended once to the whole script instead of to every step.
+
+    Attributes:
+        - docker (Docker): The Docker object providing the SSH connection and credentials.
+        - steps (List[str]): The commands collected so far, with raw commands grouped in braces.
+        - files (Dict[str, str]): Env files referenced by the steps, uploaded while the script is executed.
+    """
+
+    def __init__(self, docker: Docker, steps: List[str] = None) -> None:
+        """
+        Initializes the script with the Docker object and optional initial commands.
+
+        Args:
+            docker (Docker): The Docker object providing the SSH connection and credentials.
+            steps (List[str], optional): Initial commands of the script.
+        """
+        self.docker = docker
+        self.steps = [_group(step) for step in steps or ()]
+        self.files = {}
+
+    def add(self, command: str) -> "DockerScript":
+        """Appends an already constructed command, e.g. `Git.clone(..., return_command=True)`."""
+        self.steps.append(_group(command))
+        return self
+
+    def run(self, docker_flags: List[str], image_name: str, app_args: List[str] = None) -> "DockerScript":
+        """Appends a `docker run` command. See `Docker.run`."""
+        self.steps.append(self.docker._run_command(docker_flags, image_name, app_args))
+        self.files.update(_uploads(flatten(docker_flags)))
+        return self
+
+    def build(self, image_name: str, docker_flags: List[str], project_path: str = ".", reuse: bool = False) -> "DockerScript":
+        """Appends a `docker build` command. See `Docker.build`."""
+        self.steps.append(self.docker._build_command(image_name, docker_flags, project_path, reuse))
+        return self
+
+    def _render(self, as_script: bool, password_stdin: bool) -> str:
+        """
+        Constructs the command for the collected steps, preceded by a single `docker login` if credentials are provided.
+
+        Args:
+            as_script (bool): Whether to render an `sh -c` script instead of an `&&`-joined command.
+            password_stdin (bool): Whether the login password is sent on the command's standard input.
+
+        Returns:
+            str: The command.
+        """
+        if not self.steps:
+            raise ValueError("DockerScript has no steps to execute.")
+        if not as_script:
+            return self.docker._with_login(" && ".join(self.steps), password_stdin)
+        lines = ["set -e"]
+        login_command = self.docker._login_command(password_stdin)
+        if login_command:
+            lines.append(login_command)
+        lines.extend(self.steps)
+        return "sh -c " + shlex.quote("\n".join(lines))
+
+    def command(self) -> str:
+        """
+        Constructs the combined, self-contained command, preceded by a single `docker login` if credentials are provided.
+
+        Returns:
+            str: The combined command.
+        """
+        _check_no_uploads(self.files)
+        return self._render(as_script=False, password_stdin=False)
+
+    def script(self) -> str:
+        """
+        Constructs a self-contained `set -e` shell script with one step per line, passed to `sh -c` as a quoted argument.
+
+        The script is not read from stdin, so steps that read stdin cannot consume the lines after them.
+
+        Returns:
+            str: The `sh -c` command including the script.
+        """
+        _check_no_uploads(self.files)
+        return self._render(as_script=True, password_stdin=False)
+
+    def execute(self, as_script: bool = False, **kwargs):
+        """
+        Executes all collected commands in a single SSH call, sending the login password on standard input.
+
+        Args:
+            as_script (bool, optional): Whether to send the steps as an `sh -c` script instead of an `&&`-joined command. Defaults to False.
+            **kwargs: Additional arguments for SSH execution.
+        """
+        return self.docker._ssh(command=self._render(as_script, password_stdin=True), files=self.files, **kwargs)
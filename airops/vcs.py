@@ -1,8 +1,6 @@
 from typing import List
-from airflow.providers.ssh.operators.ssh import SSHOperator
-import shlex
-
-from typing import List
+from airops._shell import flatten, join_args
+from airops._ssh import _SSHMixin
 
 class GitCloneFlag:
     """
@@ -34,32 +32,36 @@ class GitCloneFlag:
         return ["--branch", name]
 
 
-class Git:
+class Git(_SSHMixin):
+    """
+    Manages Git commands execution via SSH, sharing the pooled SSH connection with the Docker class.
+
+    Attributes:
+        - ssh_conn_id (str): SSH connection ID used to connect to the remote machine.
+    """
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, ssh_conn_id: str) -> None:
+        """
+        Initializes the Git object with SSH connection details.
+
+        Args:
+            ssh_conn_id (str): SSH connection ID used to connect to the remote machine.
+        """
+        self.ssh_conn_id = ssh_conn_id
 
-    def _ssh(self, command, **kwargs):
+    def clone(self, repository_url: str, directory: str=".", flags: List[GitCloneFlag] = None, return_command: bool = False, **kwargs):
         """
-        Executes the given command on the remote machine via SSH.
+        Executes a `git clone` command with specified flags.
 
         Args:
-            command (str): The command to execute.
+            repository_url (str): The URL of the repository to clone.
+            directory (str, optional): The directory to clone into. Defaults to ".".
+            flags (List[GitCloneFlag], optional): List of flags to pass to the `git clone` command.
+            return_command (bool, optional): Whether to return the command instead of executing it. Defaults to False.
             **kwargs: Additional arguments for SSH execution.
         """
-        return SSHOperator(**{
-            "ssh_conn_id": self.ssh_conn_id,
-            "command": command,
-            **kwargs})
-    
-    def clone(self, repository_url: str, directory: str=".", flags: List[GitCloneFlag] = None, return_command: bool = False, **kwargs) -> None:
-        flags = flags or list()
-        flatten_flags = []
-        for f in flags:
-            flatten_flags.extend(f)
-        args = ["git", "clone", *flatten_flags, repository_url, directory]
-        safe_args = [shlex.quote(arg) for arg in args]
-        command = " ".join(safe_args)
+        args = [*flatten(flags), repository_url, directory]
+        command = "git clone " + join_args(args)
         if return_command:
             return command
         else:
@@ -1,4 +1,34 @@
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
+from setuptools.command.build_ext import build_ext
+import warnings
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    try:
+        ext_modules = cythonize([Extension("airops._shell_c", ["airops/_shell_c.pyx"])])
+    except Exception as e:
+        warnings.warn(f"Skipping compiled airops helpers: {e}")
+        ext_modules = []
+
+
+class OptionalBuildExt(build_ext):
+    """Builds the compiled helpers when possible, falling back to the pure-Python ones otherwise."""
+
+    def run(self):
+        try:
+            super().run()
+        except Exception as e:
+            self.warn(f"Skipping compiled airops helpers: {e}")
+
+    def build_extension(self, ext):
+        try:
+            super().build_extension(ext)
+        except Exception as e:
+            self.warn(f"Skipping compiled airops helpers: {e}")
+
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
@@ -13,14 +43,20 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/MuhammetAyan/airops",
     packages=find_packages(),
+    package_data={"airops": ["*.pyx"]},
+    ext_modules=ext_modules,
+    cmdclass={"build_ext": OptionalBuildExt},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     install_requires=[
         "apache-airflow",
         "apache-airflow-providers-ssh"
     ],
+    extras_require={
+        "async": ["asyncssh"],
+    },
 )
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import pytest
+from unittest import mock
+
+pytest.importorskip("asyncssh")
+
+from airops import async_docker as async_docker_module
+from airops.async_docker import AsyncDocker, DockerAPIError
+
+
+def response(status, body=None, chunked=False):
+    data = json.dumps(body).encode() if body is not None else b""
+    if chunked:
+        return f"HTTP/1.1 {status} OK\r\nTransfer-Encoding: chunked\r\n\r\n{len(data):x}\r\n".encode() + data + b"\r\n0\r\n\r\n"
+    return f"HTTP/1.1 {status} OK\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+
+
+class FakeWriter:
+    def __init__(self, requests):
+        self.requests = requests
+
+    def write(self, data):
+        self.requests.append(data)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def open_unix_connection(self, path, encoding=None):
+        reader = asyncio.StreamReader()
+        reader.feed_data(self.responses.pop(0))
+        reader.feed_eof()
+        return reader, FakeWriter(self.requests)
+
+
+def make_docker(responses):
+    docker = AsyncDocker(ssh_conn_id="my_ssh_connection")
+    docker._conn = FakeConnection(responses)
+    return docker
+
+
+def test_async_docker_run():
+    docker = make_docker([
+        response(201, {"Id": "abc"}),
+        response(204),
+        response(200, {"StatusCode": 3}, chunked=True),
+        response(204),
+    ])
+    exit_code = asyncio.run(docker.run("my_image", cmd=["python", "app.py"], env={"A": "1"}, publish={"8080": "80"}))
+    assert exit_code == 3
+    requests = docker._conn.requests
+    assert [r.split(b" ", 2)[:2] for r in requests] == [
+        [b"POST", b"/containers/create"],
+        [b"POST", b"/containers/abc/start"],
+        [b"POST", b"/containers/abc/wait"],
+        [b"DELETE", b"/containers/abc"],
+    ]
+    config = json.loads(requests[0].split(b"\r\n\r\n", 1)[1])
+    assert config["Cmd"] == ["python", "app.py"]
+    assert config["Env"] == ["A=1"]
+    assert config["HostConfig"]["PortBindings"] == {"80/tcp": [{"HostPort": "8080"}]}
+
+
+@pytest.mark.parametrize("detach, failing", [(False, "start"), (True, "start"), (False, "wait")])
+def test_async_docker_run_failure_removes_container(detach, failing):
+    responses = [response(201, {"Id": "abc"})]
+    if failing == "wait":
+        responses.append(response(204))
+    responses += [response(500, {"message": "boom"}), response(409, {"message": "conflict"})]
+    docker = make_docker(responses)
+    with pytest.raises(DockerAPIError, match=f"/containers/abc/{failing} failed .*boom"):
+        asyncio.run(docker.run("my_image", detach=detach))
+    assert docker._conn.requests[-1].startswith(b"DELETE /containers/abc?force=true ")
+
+
+def test_async_docker_concurrent_connect_opens_one_connection(monkeypatch):
+    connections = []
+
+    async def connect(host, **options):
+        await asyncio.sleep(0)
+        connections.append(mock.MagicMock())
+        return connections[-1]
+
+    hook = mock.MagicMock()
+    hook.return_value.get_connection.return_value.extra_dejson = {}
+    monkeypatch.setattr(async_docker_module, "SSHHook", hook)
+    monkeypatch.setattr(async_docker_module.asyncssh, "connect", connect)
+
+    async def main():
+        docker = AsyncDocker(ssh_conn_id="my_ssh_connection")
+        await asyncio.gather(docker.connect(), docker.connect())
+        return docker
+
+    docker = asyncio.run(main())
+    assert len(connections) == 1
+    assert docker._conn is connections[0]
+
+
+def test_async_docker_image_exists():
+    docker = make_docker([response(404, {"message": "No such image"}), response(500, {"message": "boom"})])
+    assert asyncio.run(docker.image_exists("my_image")) is False
+    with pytest.raises(DockerAPIError):
+        asyncio.run(docker.image_exists("my_image"))
+
+
+def test_async_docker_pull_stream_error():
+    stream = b'{"status": "Pulling"}\r\n{"error": "manifest unknown"}\r\n'
+    raw = f"HTTP/1.1 200 OK\r\nContent-Length: {len(stream)}\r\n\r\n".encode() + stream
+    docker = make_docker([raw])
+    with pytest.raises(DockerAPIError, match="manifest unknown"):
+        asyncio.run(docker.pull("my_image"))
+    assert docker._conn.requests[0].startswith(b"POST /images/create?fromImage=my_image&tag=latest ")
@@ -1,6 +1,21 @@
 import pytest
+import shlex
+import subprocess
+from unittest import mock
+from airops import _ssh as ssh_module
+from airops import docker as docker_module
+from airops._shell import quote_fast
 from airops.docker import Docker, DockerBuildFlag, DockerRunFlag
 
+PRINTF_LOGIN = (
+    "grep -qs '\"https://index.docker.io/v1/\"' ~/.docker/config.json"
+    " || printf '%s\\n' mypassword | docker login -u myuser --password-stdin"
+)
+STDIN_LOGIN = (
+    "if grep -qs '\"https://index.docker.io/v1/\"' ~/.docker/config.json; then cat >/dev/null;"
+    " else docker login -u myuser --password-stdin; fi"
+)
+
 @pytest.fixture
 def docker_obj():
     return Docker(ssh_conn_id="my_ssh_connection", username="myuser", password="mypassword")
@@ -23,3 +38,243 @@ def docker_run_obj(docker_obj, docker_run_flag_obj):
 @pytest.fixture
 def docker_obj_with_args(docker_obj, docker_run_flag_obj, docker_build_flag_obj):
     return Docker(docker_obj, docker_run_flag_obj, docker_build_flag_obj, image_name="my_image")
+
+
+def test_docker_run_flat_flags(docker_obj):
+    result = docker_obj.run(DockerRunFlag.temp_container() + DockerRunFlag.env({"A": "1"}), image_name="my_image", return_command=True)
+    assert result == PRINTF_LOGIN + " && docker run --rm -e A=1 my_image"
+
+
+def test_docker_pipeline_logs_in_once(docker_obj):
+    result = docker_obj.pipeline(["git clone https://example.com/app.git app"]) \
+        .build(image_name="my_image", docker_flags=DockerBuildFlag.pull(), project_path="app") \
+        .run(docker_flags=DockerRunFlag.temp_container(), image_name="my_image") \
+        .command()
+    assert result == (
+        PRINTF_LOGIN
+        + " && { git clone https://example.com/app.git app\n}"
+        " && docker build --pull -t my_image app"
+        " && docker run --rm my_image"
+    )
+
+
+def test_docker_password_sent_on_stdin(docker_obj, monkeypatch):
+    client = mock.MagicMock()
+    client.get_transport.return_value.is_active.return_value = True
+    stdin = mock.MagicMock()
+    client.exec_command.return_value = (stdin, mock.MagicMock(), mock.MagicMock())
+    monkeypatch.setattr(ssh_module, "_CLIENT_POOL", {"my_ssh_connection": client})
+    operator = docker_obj.pipeline().run(None, image_name="my_image").execute(task_id="run")
+    assert "mypassword" not in operator.command
+    operator.ssh_hook = mock.MagicMock()
+    with operator.get_ssh_client() as ssh_client:
+        ssh_client.exec_command(operator.command)
+    stdin.write.assert_called_once_with("mypassword\n")
+
+
+def test_docker_password_refused_with_pty(docker_obj):
+    flags = DockerRunFlag.interactive() + DockerRunFlag.tty()
+    with pytest.raises(ValueError):
+        docker_obj.run(flags, image_name="my_image", task_id="run", get_pty=True)
+    operator = docker_obj.run(flags, image_name="my_image", task_id="run")
+    client = mock.MagicMock()
+    with pytest.raises(ValueError):
+        ssh_module._OperatorSSHClient(client, operator).exec_command(command=operator.command, get_pty=True)
+    client.exec_command.assert_not_called()
+
+
+def test_docker_pipeline_without_steps(docker_obj):
+    with pytest.raises(ValueError):
+        docker_obj.pipeline().command()
+
+
+def test_docker_ssh_reuses_pooled_client(docker_obj, monkeypatch):
+    client = mock.MagicMock()
+    client.get_transport.return_value.is_active.return_value = True
+    hook = mock.MagicMock()
+    hook.get_conn.return_value = client
+    monkeypatch.setattr(ssh_module, "_CLIENT_POOL", {})
+    for task_id in ("first", "second"):
+        operator = docker_obj.run(None, image_name="my_image", task_id=task_id)
+        operator.ssh_hook = hook
+        with operator.get_ssh_client() as ssh_client:
+            assert ssh_client.get_transport() is client.get_transport()
+    assert hook.get_conn.call_count == 1
+    client.close.assert_not_called()
+
+
+def test_docker_ssh_replaces_dead_pooled_client(monkeypatch):
+    stale = mock.MagicMock()
+    stale.get_transport.return_value.is_active.return_value = False
+    fresh = mock.MagicMock()
+    hook = mock.MagicMock()
+    hook.get_conn.return_value = fresh
+    monkeypatch.setattr(ssh_module, "_CLIENT_POOL", {"my_ssh_connection": stale})
+    assert ssh_module._pooled_client("my_ssh_connection", hook) is fresh
+    stale.close.assert_called_once_with()
+    assert ssh_module._CLIENT_POOL == {"my_ssh_connection": fresh}
+
+
+def test_docker_ssh_on_kill_closes_only_own_channel(docker_obj, monkeypatch):
+    client = mock.MagicMock()
+    client.get_transport.return_value.is_active.return_value = True
+    channel = mock.MagicMock()
+    client.exec_command.return_value = (mock.MagicMock(), mock.MagicMock(channel=channel), mock.MagicMock())
+    monkeypatch.setattr(ssh_module, "_CLIENT_POOL", {"my_ssh_connection": client})
+    operator = docker_obj.run(None, image_name="my_image", task_id="run")
+    operator.ssh_hook = mock.MagicMock(client=client)
+    with operator.get_ssh_client() as ssh_client:
+        ssh_client.exec_command("docker run my_image")
+    operator.on_kill()
+    channel.close.assert_called_once_with()
+    client.close.assert_not_called()
+
+
+def test_flag_pairs():
+    assert DockerRunFlag.publish({"8080": "80", "443": "443"}) == ["-p", "8080:80", "-p", "443:443"]
+    assert DockerRunFlag.env({"A": "1", "B": "2"}) == ["-e", "A=1", "-e", "B=2"]
+    assert DockerRunFlag.volume({"/host": "/container"}) == ["-v", "/host:/container"]
+    assert DockerBuildFlag.build_arg({}) == []
+
+
+@pytest.mark.parametrize(
+    "arg, expected",
+    [
+        ("my_image:1.0", "my_image:1.0"),
+        ("/host/path:/container/path", "/host/path:/container/path"),
+        ("", "''"),
+        ("a b", "'a b'"),
+        ("it's", "'it'\"'\"'s'"),
+        ("café", "'café'"),
+    ],
+)
+def test_quote_fast(arg, expected):
+    assert quote_fast(arg) == expected
+
+
+@pytest.mark.parametrize(
+    "flag",
+    [
+        DockerRunFlag.detach,
+        DockerRunFlag.interactive,
+        DockerRunFlag.tty,
+        DockerRunFlag.temp_container,
+        DockerBuildFlag.no_cache,
+        DockerBuildFlag.pull,
+    ],
+)
+def test_constant_flags_are_not_shared(flag):
+    # Callers extend these lists with `+=`, so each call must return a new list.
+    flags = flag()
+    flags += ["--extra"]
+    assert flag() != flags
+
+
+def test_docker_login_checked_on_remote(docker_obj):
+    operator = docker_obj.run(None, image_name="my_image", task_id="run", on_success_callback=print)
+    assert operator.command == STDIN_LOGIN + " && docker run my_image"
+    assert operator.stdin == "mypassword\n"
+    assert operator.on_success_callback == [print]
+    assert Docker(ssh_conn_id="my_ssh_connection").run(None, image_name="my_image", return_command=True) == "docker run my_image"
+
+
+def test_docker_build_reuse():
+    result = Docker(ssh_conn_id="my_ssh_connection").build("my_image:latest", DockerBuildFlag.pull(), project_path="app", reuse=True, return_command=True)
+    assert result == (
+        "fingerprint=$(cd app && { printf '%s\\n' --pull; find . -type f -print0 | LC_ALL=C sort -z | xargs -0 sha1sum; }"
+        " | sha1sum | cut -c1-16)"
+        " && { docker image inspect my_image:\"$fingerprint\" >/dev/null 2>&1"
+        " || docker build --pull -t my_image:\"$fingerprint\" app; }"
+        " && docker tag my_image:\"$fingerprint\" my_image:latest"
+    )
+
+
+def test_docker_build_cache_flags():
+    flags = DockerBuildFlag.cache_from(["my_image:latest", "my_image:main"]) + DockerBuildFlag.buildkit_inline_cache()
+    result = Docker(ssh_conn_id="my_ssh_connection").build("my_image", flags, return_command=True)
+    assert result == (
+        "DOCKER_BUILDKIT=1 docker build --cache-from my_image:latest --cache-from my_image:main"
+        " --build-arg BUILDKIT_INLINE_CACHE=1 -t my_image ."
+    )
+
+
+def test_docker_pipeline_script(docker_obj):
+    result = docker_obj.pipeline().build(image_name="my_image", docker_flags=None).run(docker_flags=None, image_name="my_image").script()
+    assert result == "sh -c " + shlex.quote(
+        "set -e\n"
+        + PRINTF_LOGIN + "\n"
+        "docker build -t my_image .\n"
+        "docker run my_image"
+    )
+
+
+def test_docker_pipeline_script_stdin_reading_step():
+    script = Docker(ssh_conn_id="my_ssh_connection").pipeline(["head -c 5", "echo step2"]).script()
+    result = subprocess.run(["bash", "-c", script], input=b"", capture_output=True)
+    assert result.returncode == 0
+    assert result.stdout == b"step2\n"
+
+
+@pytest.mark.parametrize(
+    "steps, expected",
+    [
+        (["false", "echo a; echo b"], b""),
+        (["echo a # note", "false", "echo c"], b"a\n"),
+    ],
+)
+def test_docker_pipeline_raw_steps_are_grouped(steps, expected):
+    command = Docker(ssh_conn_id="my_ssh_connection").pipeline(steps).command()
+    result = subprocess.run(["sh", "-c", command], capture_output=True)
+    assert result.returncode != 0
+    assert result.stdout == expected
+
+
+def test_docker_precompile():
+    command = Docker.precompile("run", DockerRunFlag.temp_container() + DockerRunFlag.env({"A": "x y"}), ["my_image"])
+    assert command == "docker run --rm -e 'A=x y' my_image"
+    with pytest.warns(UserWarning):
+        assert Docker.precompile("run", DockerRunFlag.publish({8080: 80}), ["my_image", 1]) == "docker run -p 8080:80 my_image 1"
+
+
+def test_docker_run_env_file(docker_obj):
+    envs = {f"VAR{i}": f"value {i}" for i in range(3)}
+    assert DockerRunFlag.env(envs, threshold=3) == ["-e", "VAR0=value 0", "-e", "VAR1=value 1", "-e", "VAR2=value 2"]
+    flags = DockerRunFlag.temp_container() + DockerRunFlag.env(envs, threshold=2)
+    path = flags[2]
+    assert flags[1] == "--env-file" and path.startswith(".airops_env_")
+    operator = docker_obj.run(flags, image_name="my_image", task_id="run")
+    assert operator.files == {path: "VAR0=value 0\nVAR1=value 1\nVAR2=value 2\n"}
+
+    client = mock.MagicMock()
+    sftp = client.open_sftp.return_value.__enter__.return_value
+    sftp.normalize.side_effect = lambda p: "/home/myuser/" + p
+    operator.ssh_hook = mock.MagicMock()
+    operator.ssh_hook.exec_ssh_client_command.return_value = (1, b"", b"")
+    with pytest.raises(Exception):
+        operator.run_ssh_client_command(client, operator.command)
+    remote_path = sftp.open.call_args[0][0]
+    assert remote_path.startswith(path + "_")
+    assert "--env-file /home/myuser/" + remote_path + " " in operator.ssh_hook.exec_ssh_client_command.call_args[0][1]
+    sftp.remove.assert_called_once_with(remote_path)
+
+
+def test_docker_env_file_requires_execution(docker_obj):
+    flags = DockerRunFlag.env({"A": "1", "B": "2"}, threshold=1)
+    with pytest.raises(ValueError):
+        docker_obj.run(flags, image_name="my_image", return_command=True)
+    with pytest.raises(ValueError):
+        Docker.precompile("run", flags, ["my_image"])
+    script = docker_obj.pipeline().run(flags, image_name="my_image")
+    with pytest.raises(ValueError):
+        script.command()
+    assert script.execute(task_id="run").files == {flags[1]: "A=1\nB=2\n"}
+
+
+class ImageName(str):
+    pass
+
+
+@pytest.mark.parametrize("arg", ["my_image:1.0", "", "a b", "it's", "café", "$HOME", "a\nb", ImageName("my_image:1.0"), ImageName("a b")])
+def test_compiled_quote_fast_matches_shlex(arg):
+    shell_c = pytest.importorskip("airops._shell_c")
+    assert shell_c.quote_fast(arg) == shlex.quote(arg)
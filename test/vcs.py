@@ -0,0 +1,24 @@
+import pytest
+from airops.vcs import Git, GitCloneFlag
+
+@pytest.fixture
+def git_obj():
+    return Git(ssh_conn_id="my_ssh_connection")
+
+
+@pytest.mark.parametrize(
+    "flags, directory, expected",
+    [
+        (None, ".", "git clone https://example.com/app.git ."),
+        (GitCloneFlag.verbose() + GitCloneFlag.branch("main"), "my app", "git clone --verbose --branch main https://example.com/app.git 'my app'"),
+    ],
+)
+def test_git_clone(git_obj, flags, directory, expected):
+    result = git_obj.clone("https://example.com/app.git", directory, flags=flags, return_command=True)
+    assert result == expected
+
+
+def test_git_clone_operator(git_obj):
+    operator = git_obj.clone("https://example.com/app.git", task_id="clone")
+    assert operator.ssh_conn_id == "my_ssh_connection"
+    assert operator.command == "git clone https://example.com/app.git ."